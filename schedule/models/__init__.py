@@ -30,3 +30,8 @@ BlockShowRule = BlockShowRule
 
 from schedule.models.credit import ShowCredit
 ShowCredit = ShowCredit
+
+# This connects the signals that keep cached schedules up to date, so must
+# go after every model it watches.
+from schedule.models import generation
+generation = generation
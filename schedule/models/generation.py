@@ -0,0 +1,78 @@
+"""The schedule generation, which tracks changes to the models that
+schedules are built from.
+
+The generation is part of the cache key of every cached schedule (see
+:func:`schedule.utils.range_builder.cached_range_builder`), so starting a
+new one orphans them all.  It lives with the models, rather than with the
+builder, so that the signal receivers below are connected in every process
+that loads the models, and not just those that go on to build schedules.
+
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+from schedule.models.block import Block, BlockRangeRule
+from schedule.models.block_direct_rule import BlockShowRule
+from schedule.models.season import Season
+from schedule.models.show import Show, ShowType
+from schedule.models.term import Term
+from schedule.models.timeslot import Timeslot
+
+
+# The cache key holding the current schedule generation, and how long the
+# generation itself is kept for.  Losing it only means starting a new
+# generation with a cold cache.
+SCHEDULE_GENERATION_KEY = 'schedule-generation'
+SCHEDULE_GENERATION_CACHE_TIME = 60 * 60 * 24  # One day
+
+# The models that built schedules depend on: the timeslots themselves, their
+# seasons, shows and show types, the terms that decide whether there is a
+# schedule at all (and which filler slots belong to), and the block rules
+# used to annotate the slots.
+SCHEDULE_MODELS = (
+    Block,
+    BlockRangeRule,
+    BlockShowRule,
+    Season,
+    Show,
+    ShowType,
+    Term,
+    Timeslot,
+)
+
+
+def schedule_generation():
+    """Returns the current schedule generation, starting a new one if the
+    cache has forgotten it.
+    """
+    generation = cache.get(SCHEDULE_GENERATION_KEY)
+    if generation is None:
+        generation = new_schedule_generation()
+    return generation
+
+
+def new_schedule_generation(sender=None, **kwargs):
+    """Starts a new schedule generation, orphaning all cached schedules.
+
+    Generations are timestamps rather than counters, so that if the cache
+    drops the current generation we can't go back to an old one whose
+    schedules are still cached.
+
+    Returns:
+        the new generation.
+    """
+    generation = repr(time.time())
+    cache.set(
+        SCHEDULE_GENERATION_KEY,
+        generation,
+        SCHEDULE_GENERATION_CACHE_TIME
+    )
+    return generation
+
+
+for model in SCHEDULE_MODELS:
+    post_save.connect(new_schedule_generation, sender=model)
+    post_delete.connect(new_schedule_generation, sender=model)
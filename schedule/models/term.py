@@ -3,8 +3,21 @@
 # IF YOU'RE ADDING CLASSES TO THIS, DON'T FORGET TO ADD THEM TO
 # __init__.py
 
+import bisect
+
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+# The cache key under which the list of terms (and their start dates) is
+# kept, and how long, in seconds, it may be cached for.  Changes made
+# through Django clear it straight away (see clear_cached_terms), but the
+# term table may also be edited from outside.
+TERMS_CACHE_KEY = 'schedule-terms'
+TERMS_CACHE_TIME = 60 * 5  # Five minutes
 
 
 class Term(models.Model):
@@ -25,9 +38,11 @@ class Term(models.Model):
         )
 
     start_date = models.DateTimeField(
-        db_column='start')
+        db_column='start',
+        db_index=True)
     end_date = models.DateTimeField(
-        db_column='finish')
+        db_column='finish',
+        db_index=True)
     name = models.CharField(
         max_length=10,
         db_column='descr')
@@ -73,13 +88,15 @@ class Term(models.Model):
         does not lie in any known term.
 
         """
+        # Terms don't overlap, so only the last term to start on or
+        # before the date can contain it.  Asking for that term alone
+        # lets the database walk the start date index backwards from
+        # the date instead of scanning for both bounds.
         query = cls.objects.filter(
-            start_date__lte=date,
-            end_date__gt=date
-        )
-        try:
-            result = query.latest()
-        except Term.DoesNotExist:
+            start_date__lte=date
+        ).order_by('-start_date')[:1]
+        result = next(iter(query), None)
+        if result is not None and result.end_date <= date:
             result = None
         return result
 
@@ -102,6 +119,54 @@ class Term(models.Model):
             result = None
         return result
 
+    @classmethod
+    def cached_terms(cls):
+        """Returns a list of every term, in ascending order of start
+        date.
+
+        The list is cached for a short while, as terms change very
+        rarely and the schedule builders consult them constantly.
+
+        """
+        return cls.cached_terms_and_starts()[0]
+
+    @classmethod
+    def cached_terms_and_starts(cls):
+        """Returns a pair of the list of every term, in ascending order
+        of start date, and the list of those terms' start dates.
+
+        Both lists are cached together, so that searching the terms by
+        date doesn't need the dates pulled out of them each time.
+
+        """
+        terms_and_starts = cache.get(TERMS_CACHE_KEY)
+        if terms_and_starts is None:
+            terms = list(cls.objects.order_by('start_date'))
+            terms_and_starts = (
+                terms,
+                [term.start_date for term in terms]
+            )
+            cache.set(TERMS_CACHE_KEY, terms_and_starts, TERMS_CACHE_TIME)
+        return terms_and_starts
+
+    @classmethod
+    def cached_of_or_before(cls, date):
+        """
+        Returns the term of the given date if there is one, or else
+        the last term to occur before the date, or None if there is
+        no such term either.
+
+        This is equivalent to Term.of(date) or Term.before(date),
+        but uses the cached term list instead of querying the
+        database twice.
+
+        """
+        terms, starts = cls.cached_terms_and_starts()
+        # Everything left of this index started on or before the date;
+        # as terms don't overlap, the last of those is the one we want.
+        index = bisect.bisect_right(starts, date)
+        return terms[index - 1] if index else None
+
     @classmethod
     def make_foreign_key(cls):
         """
@@ -117,3 +182,10 @@ class Term(models.Model):
             help_text='The term associated with this item.',
             **_FKEY_KWARGS
         )
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+def clear_cached_terms(sender, **kwargs):
+    """Forgets the cached list of terms whenever a term changes."""
+    cache.delete(TERMS_CACHE_KEY)
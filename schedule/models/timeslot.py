@@ -6,8 +6,9 @@
 from datetime import timedelta as td
 
 from django.conf import settings
-from django.db import models
+from django.db import connection, models
 from django.db.models.query import QuerySet
+from django.utils.datastructures import SortedDict
 
 import timedelta
 
@@ -31,11 +32,70 @@ class TimeslotQuerySet(QuerySet):
     """
     def public(self):
         """Filters down to timeslots that are publicly available."""
-        return self.filter(season__in=Season.objects.public())
+        # This is equivalent to filtering on Season.objects.public(), but
+        # lets the database join down to the show type instead of running
+        # two nested subqueries.
+        return self.filter(season__show__show_type__public=True)
 
     def private(self):
         """Filters down to timeslots that are not publicly available."""
-        return self.filter(season__in=Season.objects.private())
+        return self.filter(season__show__show_type__public=False)
+
+    def with_shows(self):
+        """Pulls in each timeslot's season, show and show type in the same
+        query as the timeslot itself.
+
+        These are needed by almost everything that displays a schedule
+        (show type checks, titles, links), and would otherwise be fetched
+        with one query per timeslot.
+        """
+        return self.select_related('season__show__show_type')
+
+    def with_local_times(self, tz_name):
+        """Has the database annotate each timeslot with its start and end
+        as naive datetimes in the timezone named tz_name, as the attributes
+        local_start and local_end.
+
+        This saves converting every timeslot to local time in Python when
+        building schedule tables.  Only PostgreSQL can do the conversion
+        for us, so callers should check connection.vendor first and fall
+        back to converting in Python (as week_table.slot_bounds does for
+        timeslots without the attributes).
+
+        The timeslot start time column must be a 'timestamp with time
+        zone', as Django creates it when USE_TZ is on.  On a 'timestamp
+        without time zone' column, AT TIME ZONE takes the stored time to
+        be local and converts it to UTC, which is the wrong way round.
+
+        Raises:
+            NotImplementedError: the database is not PostgreSQL.
+        """
+        if connection.vendor != 'postgresql':
+            raise NotImplementedError(
+                'Only PostgreSQL can convert timeslots to local time.'
+            )
+        start = '{}.{}'.format(
+            connection.ops.quote_name(self.model._meta.db_table),
+            connection.ops.quote_name(
+                self.model._meta.get_field('start_time').column
+            )
+        )
+        duration = '{}.{}'.format(
+            connection.ops.quote_name(self.model._meta.db_table),
+            connection.ops.quote_name(
+                self.model._meta.get_field('duration').column
+            )
+        )
+        return self.extra(
+            select=SortedDict((
+                ('local_start', '{} AT TIME ZONE %s'.format(start)),
+                (
+                    'local_end',
+                    '({} + {}) AT TIME ZONE %s'.format(start, duration)
+                )
+            )),
+            select_params=(tz_name, tz_name)
+        )
 
     def in_range(self, from_date, to_date):
         """Filters towards a QuerySet of items in this QuerySet that are
@@ -106,6 +166,7 @@ class Timeslot(p_mixins.ApprovableMixin,
     season = Season.make_foreign_key()
     start_time = models.DateTimeField(
         db_column='start_time',
+        db_index=True,
         help_text='The date and time of the start of this timeslot.'
     )
     duration = timedelta.TimedeltaField(
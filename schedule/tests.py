@@ -4,13 +4,22 @@ This module contains unit tests for the schedule app.
 
 import operator
 
+import pytz
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import TestCase
-from schedule.models import Term, Timeslot, Show, Season
+from schedule.models import Term, Timeslot, Show, ShowType, Season
+from schedule.models import generation
+from schedule.models import term as term_models
 from schedule.utils import filler
+from schedule.utils.range import dst_add, is_fixed_offset
+from schedule.utils import range_builder
+from schedule.utils.range_builder import term_status
+from schedule.utils import week_table
+from schedule.utils import object as schedule_object
 from schedule.utils.object import Schedule
 from schedule.views import week
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 
 class ScheduleTests(TestCase):
@@ -105,6 +114,17 @@ class ScheduleTests(TestCase):
         self.assertFalse(self.builder_run)
 
 
+def local_cache():
+    """
+    Returns an empty in-memory cache, to stand in for the test
+    settings' dummy cache in tests that need things actually cached.
+
+    """
+    cache = LocMemCache('schedule-tests', {})
+    cache.clear()
+    return cache
+
+
 class TermTestbed(TestCase):
     """
     Tests that the :class:`Term` model behaves itself.
@@ -143,6 +163,62 @@ class TermTestbed(TestCase):
         for term in self.terms:
             self.assertEqual(Term.before(term.end_date), term)
 
+    def test_term_status(self):
+        """
+        Tests whether :func:`term_status` agrees with :method:`of` and
+        :method:`before` on and around term boundaries.
+
+        """
+        for term in self.terms:
+            for date in (term.start_date, term.end_date):
+                if Term.of(date):
+                    expected = 'in_term'
+                elif Term.before(date):
+                    expected = 'not_in_term'
+                else:
+                    expected = 'empty'
+                self.assertEqual(term_status(date), expected)
+        self.assertEqual(
+            term_status(self.terms[0].start_date - timedelta(days=1)),
+            'empty'
+        )
+
+    def test_cached_of_or_before(self):
+        """
+        Tests whether :method:`cached_of_or_before` agrees with
+        :method:`of` and :method:`before` on term boundaries.
+
+        """
+        for term in self.terms:
+            for date in (term.start_date, term.end_date):
+                self.assertEqual(
+                    Term.cached_of_or_before(date),
+                    Term.of(date) or Term.before(date)
+                )
+
+    def test_cached_terms_invalidation(self):
+        """
+        Tests whether changing a term clears the cached term list.
+
+        The test settings use a dummy cache, which never caches
+        anything, so a real one is swapped in here.
+
+        """
+        real_cache = term_models.cache
+        term_models.cache = local_cache()
+        try:
+            term = self.terms[0]
+            self.assertEqual(Term.cached_terms()[0].name, term.name)
+            # Changes made behind Django's back go unnoticed...
+            Term.objects.filter(pk=term.pk).update(name='Stale')
+            self.assertEqual(Term.cached_terms()[0].name, term.name)
+            # ...but saving a term clears the cache.
+            term.name = 'Changed'
+            term.save()
+            self.assertEqual(Term.cached_terms()[0].name, 'Changed')
+        finally:
+            term_models.cache = real_cache
+
 
 class FillEmptyRange(TestCase):
     """
@@ -356,6 +432,37 @@ class WeekSchedule(TestCase):
                     'Incorrect day returned as Monday.'
                 )
 
+    def test_days_over_dst(self):
+        """
+        Tests that each day of a week with a DST change in it starts
+        at the same local time, rather than 24 hours after the last.
+
+        """
+        tz = pytz.timezone('Europe/London')
+        # British Summer Time started on Sunday the 31st of March 2013.
+        sched = schedule_object.WeekSchedule(
+            start=tz.localize(datetime(2013, 3, 25, 7)),
+            builder=lambda schedule: None
+        )
+        local_starts = [
+            timezone.make_naive(start, tz)
+            for start in sched.day_starts()
+        ]
+        self.assertEqual(
+            local_starts,
+            [datetime(2013, 3, 25, 7) + timedelta(days=i) for i in range(8)]
+        )
+        self.assertEqual(
+            [day.start for day in sched.days()],
+            sched.day_starts()[:7]
+        )
+        # The clocks went forward early on the Sunday, so the Saturday is
+        # an hour short.
+        self.assertEqual(
+            sched.day_starts()[6] - sched.day_starts()[5],
+            timedelta(hours=23)
+        )
+
 
 class ShowScheduledSet(TestCase):
     """
@@ -522,3 +629,257 @@ class ShowListableSet(TestCase):
             self.assertTrue(show.show_type.has_showdb_entry)
         for show in unscheduled:
             self.assertNotIn(show, shows)
+
+
+class StubSlot(object):
+    """
+    A stand-in for :class:`Timeslot` carrying only what the week
+    table needs, so that tabulation can be tested without the database.
+
+    """
+    def __init__(self, start_time, duration, is_collapsible=False):
+        self.start_time = start_time
+        self.duration = duration
+        self.is_collapsible = is_collapsible
+
+    @property
+    def end_time(self):
+        return self.start_time + self.duration
+
+
+class StubSchedule(object):
+    """A stand-in for a week :class:`Schedule` with precomputed data."""
+    def __init__(self, start, data):
+        self.start = start
+        self.data = data
+
+
+class WeekTableTests(TestCase):
+    """
+    Tests that :func:`week_table.tabulate` lays out a known week
+    correctly.
+
+    """
+    def setUp(self):
+        # Each day: show A 07:00-09:00, filler 09:00-10:00, then show B
+        # from 10:00 until 07:00 the next day.
+        self.start = timezone.make_aware(
+            datetime(2013, 5, 6, 7),
+            timezone.get_current_timezone()
+        )
+        self.days = []
+        data = []
+        for day in xrange(7):
+            day_start = self.start + timedelta(days=day)
+            a = StubSlot(day_start, timedelta(hours=2))
+            f = StubSlot(
+                day_start + timedelta(hours=2),
+                timedelta(hours=1),
+                is_collapsible=True
+            )
+            b = StubSlot(day_start + timedelta(hours=3), timedelta(hours=21))
+            self.days.append((a, f, b))
+            data.extend((a, f, b))
+        self.table = week_table.tabulate(StubSchedule(self.start, data))
+
+    def test_rows(self):
+        """
+        Tests whether the table has one row per partition, starting
+        at the schedule start.
+
+        """
+        # Hour partitions from 07:00 to 06:00 the next morning.
+        self.assertEqual(len(self.table), 24)
+        self.assertEqual(
+            self.table[0][week_table.SCHEDULE_TIME_COL],
+            self.start.replace(tzinfo=None)
+        )
+
+    def test_cells(self):
+        """
+        Tests whether each slot starts on the right row and spans the
+        right number of rows, with continuation rows left empty.
+
+        """
+        for day, (a, f, b) in enumerate(self.days):
+            col = week_table.SCHEDULE_DAY_OFFSET + day
+            self.assertEqual(self.table[0][col], week_table.Cell(a, 2))
+            self.assertIsNone(self.table[1][col])
+            self.assertEqual(self.table[2][col], week_table.Cell(f, 1))
+            self.assertEqual(self.table[3][col], week_table.Cell(b, 21))
+            for row in self.table[4:]:
+                self.assertIsNone(row[col])
+
+    def test_precomputed_local_times(self):
+        """
+        Tests whether slot bounds come from the local start and end
+        times annotated by the database, when a slot has them, rather
+        than from converting the slot's own times.
+
+        """
+        nlstart = self.start.replace(tzinfo=None)
+        # No start time or duration, so using them would fail.
+        slot = StubSlot(None, None)
+        slot.local_start = nlstart + timedelta(hours=1)
+        slot.local_end = nlstart + timedelta(days=1, hours=2)
+        bounds = week_table.slot_bounds(
+            nlstart,
+            [slot],
+            timezone.get_current_timezone()
+        )
+        self.assertEqual(
+            list(bounds),
+            [(slot, 60 * 60, week_table.DAY_SECONDS + 2 * 60 * 60)]
+        )
+
+
+class DstAdd(TestCase):
+    """
+    Tests that dst_add keeps to local time across DST changes, including in
+    timezones whose DST rules have changed over the years.
+
+    """
+    def test_fixed_offsets(self):
+        """Tests which timezones are known to have fixed UTC offsets."""
+        self.assertTrue(is_fixed_offset(timezone.utc))
+        self.assertTrue(is_fixed_offset(pytz.FixedOffset(60)))
+        self.assertFalse(is_fixed_offset(pytz.timezone('Europe/London')))
+        # This had no DST in 2000, but did in 2013.
+        self.assertFalse(
+            is_fixed_offset(pytz.timezone('Africa/Casablanca'))
+        )
+
+    def test_dst_change(self):
+        """Tests adding a day over the start of DST."""
+        tz = pytz.timezone('Africa/Casablanca')
+        start = tz.localize(datetime(2013, 4, 27, 12))
+        result = dst_add(start, timedelta(days=1))
+        self.assertEqual(
+            timezone.make_naive(result, tz),
+            datetime(2013, 4, 28, 12)
+        )
+        self.assertEqual(result - start, timedelta(hours=23))
+
+
+class StubShowSlot(object):
+    """
+    A stand-in for :class:`Timeslot` carrying only what
+    :func:`range_builder.has_private_slots` looks at.
+
+    """
+    def __init__(self, pk, public):
+        self.pk = pk
+        self.show_type = ShowType(public=public)
+
+
+class CachedRangeBuilder(TestCase):
+    """
+    Tests that :func:`range_builder.cached_range_builder` caches what
+    it builds, and forgets it when the schedule changes.
+
+    The test settings use a dummy cache, which never caches anything,
+    so a real one is swapped in for these tests, and the builder it
+    wraps is swapped for one that counts how often it is run.
+
+    """
+    def setUp(self):
+        self.real_caches = (range_builder.cache, generation.cache)
+        range_builder.cache = generation.cache = local_cache()
+
+        self.real_builder = range_builder.range_builder
+        self.builds = 0
+        self.data = [StubShowSlot(1, True), StubShowSlot(None, True)]
+
+        def builder(schedule, timeslots=None):
+            self.builds += 1
+            return self.data
+        range_builder.range_builder = builder
+
+        self.sched = StubSchedule(
+            timezone.make_aware(
+                datetime(2013, 5, 6, 7),
+                timezone.get_current_timezone()
+            ),
+            None
+        )
+        self.sched.end = self.sched.start + timedelta(weeks=1)
+        # The stub builder never evaluates this.
+        self.everything = Timeslot.objects.all()
+
+    def tearDown(self):
+        range_builder.cache, generation.cache = self.real_caches
+        range_builder.range_builder = self.real_builder
+
+    def test_hit(self):
+        """Tests whether a second build comes from the cache."""
+        first = range_builder.cached_range_builder(self.sched)
+        second = range_builder.cached_range_builder(self.sched)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(
+            [slot.pk for slot in first],
+            [slot.pk for slot in second]
+        )
+
+    def test_new_generation(self):
+        """Tests whether a new schedule generation orphans the cache."""
+        range_builder.cached_range_builder(self.sched)
+        generation.new_schedule_generation()
+        range_builder.cached_range_builder(self.sched)
+        self.assertEqual(self.builds, 2)
+
+    def test_share_without_private(self):
+        """
+        Tests whether a schedule built from every timeslot is cached
+        for the public schedule too when it has no private slots.
+
+        """
+        range_builder.cached_range_builder(self.sched, self.everything, 'all')
+        range_builder.cached_range_builder(self.sched)
+        self.assertEqual(self.builds, 1)
+
+    def test_no_share_with_private(self):
+        """
+        Tests whether a schedule built from every timeslot is kept
+        away from the public schedule when it has private slots.
+
+        """
+        self.data.append(StubShowSlot(2, False))
+        range_builder.cached_range_builder(self.sched, self.everything, 'all')
+        range_builder.cached_range_builder(self.sched)
+        self.assertEqual(self.builds, 2)
+
+    def test_missing_key(self):
+        """
+        Tests whether timeslots given without a key to cache them under
+        are refused, rather than cached as if they were the public ones.
+
+        """
+        self.assertRaises(
+            ValueError,
+            range_builder.cached_range_builder,
+            self.sched,
+            self.everything
+        )
+        self.assertRaises(
+            ValueError,
+            range_builder.cached_range_builder,
+            self.sched,
+            None,
+            'all'
+        )
+        self.assertEqual(self.builds, 0)
+
+    def test_has_private_slots(self):
+        """
+        Tests whether only saved private slots count as private, and
+        whether builder excuses never do.
+
+        """
+        self.assertFalse(range_builder.has_private_slots(self.data))
+        self.assertFalse(
+            range_builder.has_private_slots([StubShowSlot(None, False)])
+        )
+        self.assertTrue(
+            range_builder.has_private_slots([StubShowSlot(3, False)])
+        )
+        self.assertFalse(range_builder.has_private_slots('empty'))
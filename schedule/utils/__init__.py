@@ -30,6 +30,14 @@ range
     :undoc-members:
     :show-inheritance:
 
+range_builder
+-------------
+
+.. automodule:: schedule.utils.range_builder
+    :members:
+    :undoc-members:
+    :show-inheritance:
+
 """
 
 # Remember to add autodocumentation for any important submodules of
@@ -76,9 +76,7 @@ def term(start_time, duration):
     duration -- the duration of the filler timeslot being
         created, as a timedelta
     """
-    term = Term.of(start_time)
-    if not term:
-        term = Term.before(start_time)
+    term = Term.cached_of_or_before(start_time)
     if not term:
         raise exceptions.ScheduleInconsistencyError(
             exceptions.MSG_NO_TERM_WHILE_FILLING.format({
@@ -166,14 +164,12 @@ def start_after(time, qs):
     If there is no such timeslot, the original time is returned.
 
     """
-    slots = qs.filter(start_time__gte=time)
-    try:
-        result = slots.values_list(
+    starts = list(
+        qs.filter(start_time__gte=time).values_list(
             'start_time', flat=True
-        ).order_by('start_time')[0]
-    except IndexError:
-        result = time
-    return result
+        ).order_by('start_time')[:1]
+    )
+    return starts[0] if starts else time
 
 
 ## FILLING ALGORITHM
@@ -185,56 +181,60 @@ def fill(timeslots, start_time, end_time):
     to the given end time.
 
     Keyword arguments:
-    timeslots -- the list of timeslots, may be empty
+    timeslots -- the list (or any other iterable) of timeslots, may
+        be empty
     start_time -- the start date/time
     end_time -- the end date/time
 
     """
+    return list(fill_iter(timeslots, start_time, end_time))
+
+
+def fill_iter(timeslots, start_time, end_time):
+    """
+    Like fill, but returns an iterator that yields the timeslots and
+    filler slots one at a time as it walks the given timeslots.
+
+    This means the input can itself be an iterator (such as a
+    QuerySet's iterator()), and that no filler slots are created
+    beyond the point where the caller stops consuming the result.
+
+    Keyword arguments:
+    timeslots -- the iterable of timeslots, may be empty
+    start_time -- the start date/time
+    end_time -- the end date/time
+
+    """
+    # Checked here, rather than in the generator, so that bad ranges
+    # are rejected straight away instead of on first iteration.
     if start_time > end_time:
         raise ValueError('Start time is after end time.')
 
     qs = Timeslot.objects.public()
 
-    if not timeslots:
-        filled_timeslots = [
-            timeslot(
+    def generate():
+        # We walk the timeslots once, remembering where the last one
+        # ended so that we can add a filler slot before the next show
+        # whenever the two don't follow on from each other.
+        prev_end = None
+        for ts in timeslots:
+            if prev_end is None:
+                # Fill in any gap before the first item
+                if ts.start_time > start_time:
+                    yield timeslot(end_before(start_time, qs), ts.start_time)
+            elif prev_end < ts.start_time:
+                yield timeslot(prev_end, ts.start_time)
+            yield ts
+            prev_end = ts.end_time
+
+        if prev_end is None:
+            # There were no timeslots at all, so fill the whole range.
+            yield timeslot(
                 end_before(start_time, qs),
                 start_after(end_time, qs)
             )
-        ]
-    else:
-        filled_timeslots = []
-        # Fill in any gap before the first item
-        if timeslots[0].start_time > start_time:
-            filled_timeslots.append(
-                timeslot(
-                    end_before(start_time, qs),
-                    timeslots[0].start_time
-                )
-            )
-        # Next, fill in everything else
-        # We're doing this by comparing each new show to the
-        # last inserted show (if any) to see if they follow on from
-        # each other; if they don't then we add a filler slot before
-        # adding the next show
-        for ts in timeslots:
-            if filled_timeslots and (
-                    filled_timeslots[-1].end_time
-                    < ts.start_time
-            ):
-                filled_timeslots.append(
-                    timeslot(
-                        filled_timeslots[-1].end_time,
-                        ts.start_time
-                    )
-                )
-            filled_timeslots.append(ts)
-        # Finally fill the end
-        if filled_timeslots[-1].end_time < end_time:
-            filled_timeslots.append(
-                timeslot(
-                    filled_timeslots[-1].end_time,
-                    start_after(end_time, qs)
-                )
-            )
-    return filled_timeslots
+        elif prev_end < end_time:
+            # Finally fill the end
+            yield timeslot(prev_end, start_after(end_time, qs))
+
+    return generate()
@@ -42,7 +42,7 @@ def nldiff(a, b):
     return nld(a) - nld(b)
 
 
-def nld(date):
+def nld(date, tz=None):
     """Converts aware dates to their naive local time representation.
 
     In other words, converts the timezone from the aware date timezone (usually
@@ -51,9 +51,11 @@ def nld(date):
 
     Args:
         date: the active datetime to convert to naive local
+        tz: (Optional) the local timezone; if not given, the current timezone
+            is looked up.  Callers converting many dates at once should look
+            the timezone up once and pass it in.
 
     Returns:
         the naive local datetime equivalent
     """
-    local = timezone.localtime(date)
-    return timezone.make_naive(local, local.tzinfo)
+    return timezone.make_naive(date, tz or timezone.get_current_timezone())
@@ -8,11 +8,19 @@ import datetime
 
 from django.db import models as d_models
 
-from .. import utils
-from .. import models
-from ..utils import block
 from ..utils import range as r
 from ..utils import week_table
+from ..utils.range_builder import cached_range_builder, range_builder
+
+# Re-exported so that views can keep using object.range_builder.
+range_builder = range_builder
+cached_range_builder = cached_range_builder
+
+
+# The URL keyword arguments of day and week schedules, which are filled from
+# the start of the schedule's ISO calendar date.
+DAY_URL_KEYS = ('year', 'week', 'weekday')
+WEEK_URL_KEYS = ('year', 'week')
 
 
 class Schedule(object):
@@ -23,6 +31,13 @@ class Schedule(object):
     the act of compiling the schedule from model queries until the moment its
     contents are required.
     """
+    # Schedules are created in bulk (for example by previous/next/days), so
+    # don't give each one an attribute dictionary.
+    __slots__ = ('start', 'end', 'range', '_data', 'builder')
+
+    # The names of the __init__ arguments, which replace copies across.
+    INIT_KEYS = ('start', 'range', 'builder')
+
     def __init__(self, start, range, builder):
         """Creates a new :class:`Schedule`.
 
@@ -58,13 +73,11 @@ class Schedule(object):
         Returns:
             a new Schedule with the directed replacements made.
         """
-        initargs = {
-            key: getattr(self, key)
-            for key in ['start', 'range', 'builder']
-        }
-        initargs.update(kwargs)
+        for key in self.INIT_KEYS:
+            if key not in kwargs:
+                kwargs[key] = getattr(self, key)
 
-        return self.__class__(**initargs)
+        return self.__class__(**kwargs)
 
     def previous(self):
         """Returns the previous schedule.
@@ -73,7 +86,11 @@ class Schedule(object):
             A schedule object representing the schedule period immediately
             before this one.
         """
-        return self.replace(start=self.start - self.range)
+        return self.__class__(
+            start=self.start - self.range,
+            range=self.range,
+            builder=self.builder
+        )
 
     def next(self):
         """Returns the next schedule.
@@ -82,7 +99,11 @@ class Schedule(object):
             A schedule object representing the schedule period immediately
             after this one.
         """
-        return self.replace(start=self.start + self.range)
+        return self.__class__(
+            start=self.start + self.range,
+            range=self.range,
+            builder=self.builder
+        )
 
     @property
     def data(self):
@@ -106,6 +127,7 @@ class Schedule(object):
 
 class DaySchedule(Schedule):
     """A schedule type that specifically works for day schedule ranges."""
+    __slots__ = ()
     type = 'Day'
 
     def __init__(self, start, builder, range=None):
@@ -132,12 +154,13 @@ class DaySchedule(Schedule):
         return (
             'schedule.views.schedule_day',
             (),
-            dict(zip(['year', 'week', 'weekday'], self.start.isocalendar()))
+            dict(zip(DAY_URL_KEYS, self.start.isocalendar()))
         )
 
 
 class WeekSchedule(Schedule):
     """A schedule type that specifically works for week schedule ranges."""
+    __slots__ = ()
     type = 'Week'
 
     def __init__(self, start, builder, range=None):
@@ -161,24 +184,36 @@ class WeekSchedule(Schedule):
 
         Returns:
             A list of seven DaySchedules in ascending chronological order
-            from Monday to Friday, each starting at the same time as this
-            WeekSchedule.
+            from Monday to Sunday, each starting at the same local time as
+            this WeekSchedule (even if DST changes part way through the
+            week).
         """
         return [
-            DaySchedule(
-                start=self.start + datetime.timedelta(days=i),
-                builder=self.builder
-            )
-            for i in range(0, 7)
+            DaySchedule(start=start, builder=self.builder)
+            for start in self.day_starts()[:7]
         ]
 
+    def day_starts(self):
+        """Returns the start times of each day of this week.
+
+        Returns:
+            A list of eight datetimes, the first seven being the starts of
+            each day from Monday to Sunday and the last being the end of the
+            week.  Each is at the same local time as the start of this
+            WeekSchedule.
+        """
+        day = datetime.timedelta(days=1)
+        return [r.dst_add(self.start, day * i) for i in range(8)]
+
     @d_models.permalink
     def get_absolute_url(self):
         """Returns a URL representing this schedule."""
         return (
             'schedule.views.schedule_week',
             (),
-            dict(zip(['year', 'week'], self.start.isocalendar()[:2]))
+            # zip stops at the end of the keys, so there is no need to slice
+            # off the weekday.
+            dict(zip(WEEK_URL_KEYS, self.start.isocalendar()))
         )
 
 
@@ -186,44 +221,6 @@ class WeekSchedule(Schedule):
 
 def to_monday(date):
     """Takes a date object / Returns a date in its week / Day set to Monday"""
-    # isocalendar()[2] is number of days since Monday plus one (Monday is #1)
-    return date - datetime.timedelta(days=(date.isocalendar()[2] - 1))
-
-
-def range_builder(schedule, timeslots=None):
-    """A simple schedule data builder.
-
-    Args:
-        schedule: The Schedule object that this function is building data for.
-        timeslots: An optional parameter allowing the Timeslot QuerySet from
-            which the schedules are built to be changed from the default of
-            Timeslot.objects.public().
-
-    Returns:
-        Either a list of schedule data, or one of the following strings
-        representing excuses for not retrieving any:
-            'empty' - The requested schedule point was outside of the bounds of
-                known schedule data.
-            'not_in_term' - The requested schedule point was in between two
-                terms.  This usually represents a break in programming.
-        These strings are distinct from any exceptions the builder might raise,
-        which relate to schedule inconsistencies whereas these results are
-        natural features of the schedule.
-    """
-    start = schedule.start
-    end = schedule.end
-
-    term = models.Term.of(start)
-    if not term:
-        result = 'empty' if not models.Term.before(start) else 'not_in_term'
-    else:
-        # Not 'if timeslots', that might evaluate the query!
-        if timeslots is None:
-            timeslots = models.Timeslot.objects.public()
-
-        slots = list(timeslots.select_related().in_range(start, end))
-        result = (
-            block.annotate(utils.filler.fill(slots, start, end))
-            if slots else 'empty'
-        )
-    return result
+    # weekday() is the number of days since Monday, without working out the
+    # rest of the ISO calendar date as isocalendar() would.
+    return date - datetime.timedelta(days=date.weekday())
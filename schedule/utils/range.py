@@ -5,12 +5,26 @@ the schedule.
 
 """
 
+import datetime
+import itertools
+
 from django.utils import timezone
 
+try:
+    import pytz
+except ImportError:
+    # Django only uses pytz if it is installed, so we can't rely on it.
+    pytz = None
+
 from . import filler
 from ..models import Timeslot
 
 
+# Types of timezone that are known to have a fixed offset from UTC.  Any
+# pytz timezone without DST rules also counts (see is_fixed_offset).
+FIXED_OFFSET_TYPES = (timezone.UTC,)
+
+
 def between(start, end, limit=None):
     """Returns a filled schedule between start and end containing limit shows.
 
@@ -27,21 +41,15 @@ def between(start, end, limit=None):
         A list of show timeslots from 'from' to 'to' inclusive, including
         filler shows and any timeslots straddling the boundary dates.
     """
-    def trim(lst):
-        return lst[:limit] if limit else lst
-
-    return trim(
-        filler.fill(
-            trim(
-                Timeslot.objects.public().select_related().in_range(
-                    start,
-                    end
-                )
-            ),
-            start,
-            end,
-        )
-    )
+    timeslots = Timeslot.objects.public().with_shows().in_range(start, end)
+    if limit:
+        timeslots = timeslots[:limit]
+
+    # Stream the timeslots through the filler rather than loading them all
+    # up front; this also means that, if we have a limit, we stop making
+    # filler slots once we have enough shows.
+    filled = filler.fill_iter(timeslots.iterator(), start, end)
+    return list(itertools.islice(filled, limit) if limit else filled)
 
 
 def day(today=None, limit=None):
@@ -90,6 +98,9 @@ def dst_add(start_date, delta):
     if timezone.is_naive(start_date):
         return start_date + delta
         # Can't do anything to a naive datetime
+    elif is_fixed_offset(start_date.tzinfo):
+        # No DST shifts to worry about, so the simple addition is right.
+        return start_date + delta
     else:
         # What we do is we strip out the timezone information from
         # the start date to turn it into a naive date, add the days
@@ -104,3 +115,26 @@ def dst_add(start_date, delta):
             timezone.make_naive(start_date, start_date.tzinfo) + delta,
             start_date.tzinfo
         )
+
+
+def is_fixed_offset(tz):
+    """Decides whether the given timezone has the same UTC offset all year
+    round (for example, UTC itself).
+
+    This goes by the type of the timezone rather than sampling its offsets,
+    as a zone's DST rules may have changed over the years: a zone with no
+    DST in one year can still have it in another.  Timezones of types not
+    known to be fixed are assumed to have DST, which is always safe.
+
+    Args:
+        tz: the tzinfo to check.
+
+    Returns:
+        True if the timezone is known to have a fixed offset from UTC;
+        False otherwise.
+    """
+    return isinstance(tz, FIXED_OFFSET_TYPES) or (
+        pytz is not None
+        and isinstance(tz, pytz.tzinfo.BaseTzInfo)
+        and not isinstance(tz, pytz.tzinfo.DstTzInfo)
+    )
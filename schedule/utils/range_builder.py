@@ -0,0 +1,167 @@
+"""The default builder for :class:`schedule.utils.object.Schedule` data.
+
+The builder is kept apart from the schedule classes themselves so that
+every schedule variant shares the one implementation.
+
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from .. import models
+from ..models.generation import schedule_generation
+from ..utils import block
+from ..utils import filler
+
+
+# How long, in seconds, built schedule data may be cached for.  Saving or
+# deleting any of models.generation.SCHEDULE_MODELS through Django orphans
+# it straight away; anything else, such as edits made to the database from
+# outside Django, only shows up once the cached data expires.
+SCHEDULE_CACHE_TIME = 60 * 5  # Five minutes
+
+
+def range_builder(schedule, timeslots=None):
+    """A simple schedule data builder.
+
+    Args:
+        schedule: The Schedule object that this function is building data for.
+        timeslots: An optional parameter allowing the Timeslot QuerySet from
+            which the schedules are built to be changed from the default of
+            Timeslot.objects.public().
+
+    Returns:
+        Either a list of schedule data, or one of the following strings
+        representing excuses for not retrieving any:
+            'empty' - The requested schedule point was outside of the bounds of
+                known schedule data.
+            'not_in_term' - The requested schedule point was in between two
+                terms.  This usually represents a break in programming.
+        These strings are distinct from any exceptions the builder might raise,
+        which relate to schedule inconsistencies whereas these results are
+        natural features of the schedule.
+    """
+    start = schedule.start
+    end = schedule.end
+
+    status = term_status(start)
+    if status != 'in_term':
+        result = status
+    else:
+        # Not 'if timeslots', that might evaluate the query!
+        if timeslots is None:
+            timeslots = models.Timeslot.objects.public()
+
+        timeslots = timeslots.with_shows().in_range(start, end)
+        # week_table converts to the current timezone too, so letting the
+        # database do it here, where it can, saves work there.
+        if connection.vendor == 'postgresql':
+            timeslots = timeslots.with_local_times(
+                timezone.get_current_timezone_name()
+            )
+        slots = list(timeslots)
+        result = (
+            block.annotate(filler.fill(slots, start, end))
+            if slots else 'empty'
+        )
+    return result
+
+
+def cached_range_builder(schedule, timeslots=None, timeslots_key=None):
+    """A schedule data builder that caches the results of range_builder.
+
+    Args:
+        schedule: The Schedule object that this function is building data for.
+        timeslots: As for range_builder.
+        timeslots_key: A short string naming the set of timeslots given, so
+            that schedules built from different sets are cached apart.  This
+            must be given if timeslots is, and must be left out (or be
+            'public') if not, as the default timeslots are cached under
+            'public'.
+
+    Returns:
+        The same as range_builder, possibly from the cache.
+
+    Raises:
+        ValueError: timeslots_key is missing for the given timeslots, or
+            given without them.
+    """
+    if timeslots is None:
+        if timeslots_key not in (None, 'public'):
+            raise ValueError('Only the public timeslots can be left out.')
+        timeslots_key = 'public'
+    elif timeslots_key is None:
+        raise ValueError('Name the timeslots given with timeslots_key.')
+    key = schedule_data_key(schedule, timeslots_key)
+    data = cache.get(key)
+    if data is None:
+        data = range_builder(schedule, timeslots)
+        to_cache = {key: data}
+        # When a schedule built from every timeslot turns out to hold no
+        # private ones, the public schedule for the same range would be
+        # built identically, so cache it for that too.
+        if timeslots_key == 'all' and not has_private_slots(data):
+            to_cache[schedule_data_key(schedule, 'public')] = data
+        cache.set_many(to_cache, SCHEDULE_CACHE_TIME)
+    return data
+
+
+def schedule_data_key(schedule, timeslots_key):
+    """Returns the cache key for a schedule's built data.
+
+    Args:
+        schedule: The Schedule object whose data is being cached.
+        timeslots_key: As for cached_range_builder.
+
+    Returns:
+        The cache key, which changes with the schedule generation and the
+        current timezone as well as the schedule and its timeslots.
+    """
+    return 'schedule-data-{}-{}-{}-{}-{}'.format(
+        timeslots_key,
+        schedule_generation(),
+        timezone.get_current_timezone_name(),
+        schedule.start.isoformat(),
+        schedule.end.isoformat()
+    )
+
+
+def has_private_slots(data):
+    """Checks whether built schedule data contains any private timeslots.
+
+    Args:
+        data: The result of range_builder.
+
+    Returns:
+        True if data is a list containing a real (saved) timeslot of a show
+        that is not public; False otherwise.  Filler slots never count, as
+        they are added to public schedules too.
+    """
+    return not isinstance(data, basestring) and any(
+        slot.pk is not None and not slot.show_type.public for slot in data
+    )
+
+
+def term_status(date):
+    """Works out where the given date lies with respect to the terms.
+
+    This is equivalent to checking Term.of and then Term.before, but uses the
+    cached list of terms instead of querying the database.
+
+    Args:
+        date: the datetime to look up.
+
+    Returns:
+        'in_term' if the date lies inside a term, 'not_in_term' if it lies
+        between two terms (or after the last one), and 'empty' if it lies
+        before any known term.
+    """
+    term = models.Term.cached_of_or_before(date)
+    if term is None:
+        result = 'empty'
+    elif date < term.end_date:
+        result = 'in_term'
+    else:
+        result = 'not_in_term'
+    return result
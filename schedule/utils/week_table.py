@@ -3,6 +3,9 @@
 You will probably want 'tabulate' specifically.
 """
 
+import bisect
+import collections
+
 from django.utils import timezone
 
 from .. import utils
@@ -12,9 +15,10 @@ from ..utils import nltime
 ###############################################################################
 # Internal constants
 
-# Common timedeltas
-HOUR = timezone.timedelta(hours=1)
-DAY = timezone.timedelta(days=1)
+# The tabulator works in whole seconds from the schedule start, which are much
+# cheaper to compare, hash and do arithmetic on than datetimes.
+HOUR_SECONDS = 60 * 60
+DAY_SECONDS = 24 * HOUR_SECONDS
 
 
 # The amount to add to the day number to get the schedule table column
@@ -26,6 +30,13 @@ SCHEDULE_DAY_OFFSET = 1
 SCHEDULE_TIME_COL = 0
 
 
+# A populated schedule table cell: the slot starting on that row, and the
+# number of rows it spans.  Being a named tuple, templates can use either
+# cell.slot and cell.rows or the older cell.0 and cell.1, and it carries no
+# per-instance dictionary.
+Cell = collections.namedtuple('Cell', ['slot', 'rows'])
+
+
 ###############################################################################
 # Public interface
 
@@ -37,19 +48,21 @@ def tabulate(schedule):
 
     Returns:
         a list of schedule rows; each row begins with the row start and
-        duration, then consists of tuples of shows active during that row, and
-        the number of rows they span.  Duplicated entries (those that carry on
-        from the previous row) are marked with None.
+        duration, then consists of Cells holding the shows active during that
+        row and the number of rows they span.  Duplicated entries (those that
+        carry on from the previous row) are marked with None.
     """
     data = schedule.data
     if isinstance(data, basestring):
         # This is just an error signifier, pass it through.
         table = data
     else:
-        nlstart = nltime.nld(schedule.start)
-        data_lists, partitions = split_days(nlstart, schedule.data)
-        table = empty_table(nlstart, partitions, len(data_lists))
-        populate_table(table, data_lists)
+        # Looking up the current timezone isn't free, so do it just once.
+        tz = timezone.get_current_timezone()
+        nlstart = nltime.nld(schedule.start, tz)
+        day_triples, partitions = split_days(slot_bounds(nlstart, data, tz))
+        table = empty_table(nlstart, partitions, len(day_triples))
+        populate_table(table, partitions[:-1], day_triples)
     return table
 
 
@@ -58,50 +71,95 @@ def tabulate(schedule):
 
 # 1. Day splitting and partitioning #
 
-def split_days(nlstart, data):
-    """Takes a list of slots and splits it into many lists of one day each.
+def slot_bounds(nlstart, data, tz):
+    """Pairs each slot with its start and end, in seconds from nlstart.
+
+    Converting to naive local time is by far the most expensive thing the
+    tabulator does per slot, so we do it exactly once per slot here and carry
+    the results around with the slot from then on.  Slots the database has
+    already converted (see TimeslotQuerySet.with_local_times) are not
+    converted again.
 
-    This function also creates a set of times representing the starts of
-    timeslots across the day lists, as local-time deltas between the schedule
-    start and the timeslot start.  This is useful for dividing the schedule
-    into rows later.
+    This is a generator, so that split_days can convert each slot as it comes
+    to it instead of making a separate pass over the data first.
 
     Args:
         nlstart: the naive local datetime representing the schedule start.
-        data: the schedule data, as a fully filled list of timeslots spanning
-            the schedule's full range and starting at the schedule's designated
-            start
+        data: the schedule data, as an iterable of timeslots.
+        tz: the local timezone.
+
+    Yields:
+        a (slot, local start, local end) tuple for each slot, in the same
+        order as data, where the bounds are in seconds since nlstart.
+    """
+    nld = nltime.nld
+    day_seconds = DAY_SECONDS
+    for slot in data:
+        local_start = getattr(slot, 'local_start', None)
+        if local_start is None:
+            start = nld(slot.start_time, tz) - nlstart
+            end = nld(slot.end_time, tz) - nlstart
+        else:
+            start = local_start - nlstart
+            end = slot.local_end - nlstart
+        yield (
+            slot,
+            start.days * day_seconds + start.seconds,
+            end.days * day_seconds + end.seconds
+        )
+
+
+def split_days(data):
+    """Takes a list of slots and splits it into many lists of one day each.
+
+    This function also creates a sorted list of times representing the starts
+    of timeslots across the day lists, as the number of seconds (in local
+    time) between the start of the timeslot's day and the timeslot start.
+    This is useful for dividing the schedule into rows later.
+
+    Args:
+        data: the schedule data, as a fully filled iterable of timeslots
+            spanning the schedule's full range and starting at the schedule's
+            designated start, annotated with their local bounds by slot_bounds
 
     Returns:
         a tuple containing the result of splitting the data into day lists, and
-        the set of observed show start times for dividing the schedule up into
-        rows later
+        the ascending list of distinct observed show start times for dividing
+        the schedule up into rows later
     """
     done_day_lists = []
     day_list = []
-    partitions = set([])
+    # Partitions are collected with duplicates, then sorted and deduplicated
+    # in one go at the end; being ints, this is all done at C level.
+    partitions = []
 
-    day_start = nlstart
-    day_end = day_start + DAY
+    # This loop runs once for every slot in the week, so keep the names it
+    # uses local.
+    day = DAY_SECONDS
+    add = add_partitions
+    append = day_list.append
 
-    for slot in data:
-        nlslot = nltime.nld(slot.start_time)
+    day_start = 0
+    day_end = day
+
+    for entry in data:
         # If the next slot is outside the day we're looking at. rotate it.
         # To deal with shows straddling multiple days, check for multiple
         # rotations (hence the while loop).
-        while day_end <= nlslot:
+        while day_end <= entry[1]:
             day_list = rotate_day(day_end, day_list, done_day_lists)
-            day_start, day_end = day_end, day_end + DAY
+            append = day_list.append
+            day_start, day_end = day_end, day_end + day
 
-        day_list.append(slot)
-        add_partitions(day_start, day_end, slot, partitions)
+        append(entry)
+        add(day_start, day_end, entry, partitions)
 
     # Finish off by pushing the last day onto the list, as nothing else will
     done_day_lists.append(day_list)
-    return done_day_lists, partitions
+    return done_day_lists, sorted(set(partitions))
 
 
-def add_partitions(day_start, day_end, slot, partitions):
+def add_partitions(day_start, day_end, entry, partitions):
     """Add row boundaries arising from this slot to the partition list.
 
     Whether or not the timeslot emits row boundaries depends on its type;
@@ -110,43 +168,42 @@ def add_partitions(day_start, day_end, slot, partitions):
     entire week.
 
     Args:
-        day_start: the naive local time of the start of the day currently being
-            split.
-        day_end: the naive local time of the end of the day currently being
-            split.
-        slot: the timeslot whose start and end times may be added as row
-            partitions.
-        partitions: the set of partitions that may be modified by this
-            function.
+        day_start: the start of the day currently being split, in seconds
+            since the schedule start.
+        day_end: the end of the day currently being split, in seconds since
+            the schedule start.
+        entry: the (slot, local start, local end) tuple whose start and end
+            times may be added as row partitions.
+        partitions: the list of partitions found so far, which may be
+            extended by this function.  It may contain duplicates.
     """
+    slot, slot_start, slot_end = entry
     if not slot.is_collapsible:
         # Prevent negative partitions if the show started on a previous day.
-        start_p = max(day_start, nltime.nld(slot.start_time)) - day_start
+        start_p = max(day_start, slot_start) - day_start
         # And overly large ones if the show ends on another day.
-        end_p = min(day_end, nltime.nld(slot.end_time)) - day_start
+        end_p = min(day_end, slot_end) - day_start
 
-        partitions |= {start_p, end_p}
+        partitions.append(start_p)
+        partitions.append(end_p)
 
         # Now add all the exact hours between start_p and end_p, if any
-        # (hour_p is set to the next hour after start_p)
-        hour_p = timezone.timedelta(
-            days=start_p.days,
-            seconds=(
-                start_p.seconds - (start_p.seconds % (60 * 60))
-            ) + (60 * 60)
-        )
-        while hour_p < end_p:
-            partitions.add(hour_p)
-            hour_p += HOUR
+        # (starting from the next hour after start_p)
+        partitions.extend(xrange(
+            start_p - (start_p % HOUR_SECONDS) + HOUR_SECONDS,
+            end_p,
+            HOUR_SECONDS
+        ))
 
 
 def rotate_day(day_end, day_list, done_day_lists):
     """Ends the current day and sets things up ready to process the next day.
 
     Args:
-        day_end: the (naive local) datetime of the end of the day that is about
-            to finish (and the start of the next day)
-        day_list: the completed list of timeslots for the day being finished.
+        day_end: the end of the day that is about to finish (and the start of
+            the next day), in seconds since the schedule start.
+        day_list: the completed list of (slot, local start, local end) tuples
+            for the day being finished.
         done_day_lists: the list of completed day lists (in chronological
             order) to push the new day onto
     Returns:
@@ -171,136 +228,155 @@ def rotate_day(day_end, day_list, done_day_lists):
     # between the two days and, if so, make sure it appears at the start of the
     # new list too.
     last_show = day_list[-1]
-    return [last_show] if nltime.nld(last_show.end_time) > day_end else []
+    return [last_show] if last_show[2] > day_end else []
 
 
 # 2. Empty table generation #
 
-def empty_table(start, partitions, n_cols):
+def empty_table(start, sorted_partitions, n_cols):
     """Creates an empty schedule table.
 
     Args:
         start: the (naive local) schedule start datetime. See nld().
-        partitions: the set of row starts, as offsets from nlstart.
+        sorted_partitions: the row starts, as offsets in seconds from start,
+            in ascending order.
         n_cols: the number of schedule columns (days), usually 7.
 
     Returns:
         an empty schedule table ready for population with show data,
         implemented as a list of row lists.
-        The table will contain len(partitions) rows, each containing the naive
-        time of their occurrence (on the first day of the schedule; add day
-        offsets for the other days), their offset from nlstart, and then
-        num_cols instances of None ready to be filled with schedule data.
+        The table will contain len(sorted_partitions) - 1 rows, each
+        containing the naive time of their occurrence (on the first day of the
+        schedule; add day offsets for the other days) and then n_cols
+        instances of None ready to be filled with schedule data.
     """
+    empty_row = [None] * n_cols
+    seconds = timezone.timedelta(seconds=1)
     # We don't want the last partition, as it marks the end of the day.
-    return [[(start + i)] + ([None] * n_cols) for i in sorted(partitions)][:-1]
+    return [
+        [start + seconds * i] + empty_row for i in sorted_partitions[:-1]
+    ]
 
 
 # 3. Population #
 
-def populate_table(table, data_lists):
+def populate_table(table, row_times, day_triples):
     """Populates empty schedule tables with data from the given lists.
 
     Args:
         table: the empty table (generally created by empty_table) to populate
             with schedule data; this is potentially mutated in-place.
-        data_lists: a list of lists, each representing one day of consecutive
-            timeslots.
+        row_times: the start of each row of the table on the first day of the
+            schedule, in seconds since the schedule start, in ascending order.
+        day_triples: a list of lists, each representing one day of
+            consecutive timeslots as (slot, local start, local end) tuples, as
+            produced by split_days.
 
     Returns:
         the populated table, which may or may not be the same object as table
         depending on implementation.
     """
-    for i, day in enumerate(data_lists):
-        populate_table_day(
-            make_row_date(table, i),
-            make_add_to_table(table, i),
-            day
-        )
+    # Maps each row time to its row index, so that we can find the row a slot
+    # ends on without scanning for it.
+    row_of = {time: i for i, time in enumerate(row_times)}
+
+    for i, day in enumerate(day_triples):
+        populate_table_day(table, row_times, row_of, i, day)
     return table
 
 
-def populate_table_day(row_date, add_to_table, day):
-    """Adds a day of slots into the table using the given functions.
+def populate_table_day(table, row_times, row_of, days, day):
+    """Adds a day of slots into the table.
 
     Args:
-        row_date: a function taking a table row index and returning the naive
-            local datetime of its start on this day.
-        add_to_table: a function taking a table row index, a timeslot whose
-            record starting on that row and the number of rows it spans, and
-            adding it into the schedule table.
+        table: the schedule table to add entries into.
+        row_times: the start of each row of the table on the first day of the
+            schedule, in seconds since the schedule start, in ascending order.
+        row_of: a dictionary mapping each time in row_times to its index.
+        days: the number of days since the start of the schedule.
+        day: the list of (slot, local start, local end) tuples making up this
+            day.
     """
+    n_rows = len(row_times)
+    col = SCHEDULE_DAY_OFFSET + days
+    day_offset = DAY_SECONDS * days
+
     current_row = 0
-    for slot in day:
+    for slot, _, slot_end in day:
         start_row = current_row
-        hit_bottom = False
-
-        # How much local time does this slot take up?
-        nlend = nltime.nld(slot.end_time)
-
-        # Work out how many rows this slot fits into.
-        try:
-            while row_date(current_row) < nlend:
-                current_row += 1
-        except IndexError:
-            # This usually means this show crosses over the day boundary;
-            # this is normal.
-            hit_bottom = True
-        else:
-            # If our partitioning is sound and we haven't run off the end
-            # of a day, then the slot must fit exactly into one or more
-            # rows.
-            if not hit_bottom and row_date(current_row) > nlend:
-                raise utils.exceptions.ScheduleInconsistencyError(
-                    'Partitioning unsound - show exceeds partition bounds.'
-                    ' (Row {}, show {}, date {} > {} < {})'.format(
-                        current_row,
-                        slot,
-                        row_date(current_row),
-                        nlend,
-                        row_date(current_row + 1)
-                    )
-                )
-
-        add_to_table(start_row, slot, current_row - start_row)
-
-
-###############################################################################
-# Higher-order functions
 
-def make_row_date(table, days):
-    """A function that makes a function mapping rows to their starting
-    datetimes.
-
-    Args:
-        table: the schedule table the returned function will look-up dates in.
-        days: the number of days since the start of the schedule.
+        # Once a slot has run off the bottom of the day, nothing after it can
+        # take up any rows.
+        if current_row < n_rows:
+            # Work out which row this slot finishes on, by moving its end
+            # back onto the first day and looking it up.
+            end_time = slot_end - day_offset
+            next_row = current_row + 1
+            if next_row < n_rows and row_times[next_row] == end_time:
+                # Most slots fill exactly one row, so check for that first.
+                end_row = next_row
+            else:
+                end_row = find_end_row(
+                    row_times,
+                    row_of,
+                    current_row,
+                    day_offset,
+                    slot,
+                    slot_end
+                )
+            current_row = end_row
 
-    Returns:
-        a function closed over table and day_offset that takes a row and
-        returns its datetime for the day being considered.
-    """
-    offset = timezone.timedelta(days=days)
-    return lambda row: table[row][SCHEDULE_TIME_COL] + offset
+        rows = current_row - start_row
+        if rows > 0:
+            table[start_row][col] = Cell(slot, rows)
 
 
-def make_add_to_table(table, days):
-    """A function that makes a function that adds a slot into a table.
+def find_end_row(row_times, row_of, current_row, day_offset, slot, slot_end):
+    """Finds the first row after the end of a slot, checking it is sound.
 
     Args:
-        table: the schedule table the returned function will add entries into.
-        days: the number of days since the start of the schedule.
+        row_times: the start of each row of the table on the first day of the
+            schedule, in seconds since the schedule start, in ascending order.
+        row_of: a dictionary mapping each time in row_times to its index.
+        current_row: the row on which the slot starts.
+        day_offset: the number of seconds between the start of the schedule
+            and the start of the day being populated.
+        slot: the slot itself, for error reporting.
+        slot_end: the end of the slot, in seconds since the schedule start.
 
     Returns:
-        a function closed over table and day_offset that takes a row, timeslot
-        to place on that row and that timeslot's row occupacy, and inserts the
-        data into the schedule table.
+        the index of the row immediately after the slot's last row, which is
+        the number of rows if the slot runs off the end of the day.
     """
-    col = SCHEDULE_DAY_OFFSET + days
-
-    # Not an expression, therefore cannot be a lambda.
-    def f(row, slot, rows):
-        if rows > 0:
-            table[row][col] = slot, rows
-
-    return f
+    n_rows = len(row_times)
+    end_time = slot_end - day_offset
+    end_row = row_of.get(end_time)
+    if end_row is None:
+        # The end isn't a row boundary, so find out where it falls.
+        end_row = bisect.bisect_left(row_times, end_time)
+        # If it's past the last row, this usually means this show
+        # crosses over the day boundary; this is normal.
+        # Otherwise, our partitioning is unsound, as a slot that
+        # doesn't run off the end of a day must fit exactly into one
+        # or more rows.
+        if end_row < n_rows:
+            raise utils.exceptions.ScheduleInconsistencyError(
+                'Partitioning unsound - show exceeds partition bounds.'
+                ' (Row {}, show {}, end {}s < {}s)'.format(
+                    end_row,
+                    slot,
+                    slot_end,
+                    row_times[end_row] + day_offset
+                )
+            )
+    elif end_row < current_row:
+        raise utils.exceptions.ScheduleInconsistencyError(
+            'Partitioning unsound - show ends before its start row.'
+            ' (Row {}, show {}, start {}s > {}s)'.format(
+                current_row,
+                slot,
+                row_times[current_row] + day_offset,
+                slot_end
+            )
+        )
+    return end_row
@@ -7,6 +7,7 @@ import datetime
 
 from django import shortcuts
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 
 from ..models import Timeslot
 from ..utils import object
@@ -21,6 +22,12 @@ URY_START = datetime.time(
 )
 
 
+# Memo of ury_start_in_timezone results by date and timezone, and the
+# number of entries it may hold before it is emptied.
+URY_START_MEMO = {}
+URY_START_MEMO_SIZE = 256
+
+
 # Jump table of schedule types to constructors.
 SCHED_CONSTRUCTORS = {
     'week': object.WeekSchedule,
@@ -28,15 +35,73 @@ SCHED_CONSTRUCTORS = {
 }
 
 
+# How long, in seconds, browsers may keep public schedules for.  Current
+# and future schedules are still being edited, so are only kept briefly;
+# schedules that are entirely in the past almost never change, so they can
+# be kept for much longer.  Schedules showing private shows are for staff
+# checking their edits, so aren't kept at all.
+SCHEDULE_MAX_AGE = 60  # One minute
+PAST_SCHEDULE_MAX_AGE = 60 * 60 * 24  # One day
+
+# How long, in seconds, browsers may keep the home page and header
+# summaries of what is on now and next before asking for them again.
+COMING_UP_MAX_AGE = 30
+
+
+def coming_up_render(request, template_name):
+    """Renders one of the summaries of what is on now and next, letting
+    browsers reuse it for a short while.
+
+    The summaries only change when a show starts or ends, but their
+    context comes from the site's context processors and may differ
+    between users, so shared caches are told not to keep them.
+
+    Args:
+        request: the HTTPRequest being responded to.
+        template_name: the name of the summary template to render.
+
+    Returns:
+        an HttpResponse containing the rendered template, with caching
+        headers set.
+    """
+    response = shortcuts.render(request, template_name)
+    patch_cache_control(response, private=True, max_age=COMING_UP_MAX_AGE)
+    return response
+
+
 def ury_start_on_date(date):
     """Returns a new datetime representing the nominal start of URY
     programming on the given date (timezone-aware).
 
     """
-    return timezone.make_aware(
+    # The current timezone can change from request to request, so it
+    # can't be hoisted out of here, but it can be part of the memo key.
+    return ury_start_in_timezone(date, timezone.get_current_timezone())
+
+
+def ury_start_in_timezone(date, tz):
+    """Returns a new datetime representing the nominal start of URY
+    programming on the given date, in the given timezone.
+
+    This is memoised, as the same few dates are requested over and
+    over again and localising them isn't free.
+
+    """
+    key = (date, tz)
+    try:
+        return URY_START_MEMO[key]
+    except KeyError:
+        pass
+    # The dates come from URLs, so don't let crawlers grow the memo
+    # without limit.
+    if len(URY_START_MEMO) >= URY_START_MEMO_SIZE:
+        URY_START_MEMO.clear()
+    start = timezone.make_aware(
         datetime.datetime.combine(date, URY_START),
-        timezone.get_current_timezone()
+        tz
     )
+    URY_START_MEMO[key] = start
+    return start
 
 
 def schedule_view(request, type, start):
@@ -64,7 +129,8 @@ def schedule_view(request, type, start):
             schedule type.
 
     Returns:
-        None
+        the rendered schedule, as an HttpResponse with caching headers
+        set.
     """
     start = ury_start_on_date(start)
 
@@ -76,21 +142,41 @@ def schedule_view(request, type, start):
         request.GET.get('iframe', 'false').lower() == 'true'
     )
 
-    to = Timeslot.objects
-    timeslots = (to.all() if show_private else to.public())
+    # The builder already restricts whichever timeslots it is given to the
+    # range of the schedule it is building, and falls back to the public
+    # timeslots if given none.  Don't filter here by range, though, as the
+    # schedule's neighbours and days share the builder.
+    timeslots = Timeslot.objects.all() if show_private else None
 
     ctx = {}
 
     sched = SCHED_CONSTRUCTORS[type.lower()]
-    ctx['schedule'] = sched(
+    timeslots_key = 'all' if show_private else 'public'
+    schedule = sched(
         start,
-        lambda s: object.range_builder(s, timeslots)
+        lambda s: object.cached_range_builder(s, timeslots, timeslots_key)
     )
+    ctx['schedule'] = schedule
 
-    return shortcuts.render(
+    response = shortcuts.render(
         request,
         'schedule/schedule-{}.html'.format(
             'iframe' if iframe else 'base'
         ),
         ctx
     )
+    # The page is rendered through the site's context processors, and so
+    # may differ between users; only let the user's own browser keep it.
+    if show_private:
+        patch_cache_control(response, private=True)
+    else:
+        patch_cache_control(
+            response,
+            private=True,
+            max_age=(
+                PAST_SCHEDULE_MAX_AGE
+                if schedule.end <= timezone.now()
+                else SCHEDULE_MAX_AGE
+            )
+        )
+    return response
@@ -1,7 +1,7 @@
 """The view used to create the schedule overview in the site's header.
 """
 
-from django.shortcuts import render
+from . import common
 
 
 def header(request, block_id=None):
@@ -9,7 +9,4 @@ def header(request, block_id=None):
     View for the "On Air/Up Next" header summary of the schedule.
 
     """
-    return render(
-        request,
-        'schedule/header.html',
-    )
+    return common.coming_up_render(request, 'schedule/header.html')
@@ -1,6 +1,6 @@
 """Home page schedule view."""
 
-from django.shortcuts import render
+from . import common
 
 
 def home_schedule(request, block_id=None):
@@ -8,7 +8,4 @@ def home_schedule(request, block_id=None):
 
     """
     # Uses template context now
-    return render(
-        request,
-        'schedule/home-schedule.html',
-    )
+    return common.coming_up_render(request, 'schedule/home-schedule.html')
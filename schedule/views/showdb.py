@@ -8,6 +8,28 @@ from django.shortcuts import get_object_or_404
 from django.http import Http404
 
 
+class KnownObjectDetailView(DetailView):
+    """A DetailView of an object that the calling view has already
+    retrieved, which saves looking it up again by primary key.
+
+    """
+    known_object = None
+
+    def get_object(self, queryset=None):
+        return self.known_object
+
+
+def nth_or_none(queryset, n):
+    """Returns the 'n'th item of 'queryset', counting from 0, or None
+    if there is no such item.
+
+    This needs only one query, unlike checking the count first.
+
+    """
+    items = list(queryset[n:n + 1]) if n >= 0 else []
+    return items[0] if items else None
+
+
 def relative_season(show_id, season_num):
     """Attempts to find the 'season_num'th season of the show with
     ID 'show_id', where the count starts from 0.
@@ -18,9 +40,7 @@ def relative_season(show_id, season_num):
         pk=show_id,
         show_type__has_showdb_entry=True
     )
-    return (show.season_set.all()[season_num]
-            if show.season_set.count() > season_num
-            else None)
+    return nth_or_none(show.season_set.select_related('show'), season_num)
 
 
 def relative_timeslot(show_id, season_num, timeslot_num):
@@ -30,9 +50,10 @@ def relative_timeslot(show_id, season_num, timeslot_num):
 
     """
     season = relative_season(show_id, season_num)
-    return (season.timeslot_set.all()[timeslot_num]
-            if (season and season.timeslot_set.count() > timeslot_num)
-            else None)
+    return (nth_or_none(
+        season.timeslot_set.select_related('season__show'),
+        timeslot_num
+    ) if season else None)
 
 
 def season_detail(request, pk, season_num):
@@ -45,7 +66,10 @@ def season_detail(request, pk, season_num):
     season = relative_season(pk, int(season_num) - 1)
     if season is None:
         raise Http404('Season does not exist.')
-    return DetailView.as_view(model=Season)(request, pk=season.pk)
+    return KnownObjectDetailView.as_view(
+        model=Season,
+        known_object=season
+    )(request)
 
 
 def timeslot_detail(request, pk, season_num, timeslot_num):
@@ -61,4 +85,7 @@ def timeslot_detail(request, pk, season_num, timeslot_num):
         int(timeslot_num) - 1)
     if timeslot is None:
         raise Http404('Timeslot does not exist.')
-    return DetailView.as_view(model=Timeslot)(request, pk=timeslot.pk)
+    return KnownObjectDetailView.as_view(
+        model=Timeslot,
+        known_object=timeslot
+    )(request)
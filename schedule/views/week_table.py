@@ -8,11 +8,18 @@ functionality is a true hero.
 
 """
 
+import bisect
+from collections import deque
 from datetime import timedelta
 from schedule.utils import range as r
 from django.utils import timezone
 
 
+# Durations used on every row of the table, so only made once.
+DAY = timedelta(days=1)
+NO_TIME = timedelta(seconds=0)
+
+
 def time_until_next_hour(time):
     """Returns the timedelta representing the amount of
     time between the given (date)time and the start of
@@ -55,13 +62,11 @@ def initial_time_remaining(week, start_date):
     the amount of show time left at the start time.
 
     """
-    diff_from_start = (
-        lambda day, num_days:
-        r.dst_add_days(timezone.localtime(start_date), num_days)
-        - day[0].start_time)
-
+    local_start = timezone.localtime(start_date)
     return [min(day[0].duration,
-                day[0].duration - diff_from_start(day, num_days))
+                day[0].duration
+                - (r.dst_add(local_start, timedelta(days=num_days))
+                   - day[0].start_time))
             for num_days, day in enumerate(week)]
 
 
@@ -75,15 +80,21 @@ def tabulate_week_lists(week,
 
     """
     assert len(week) == 7, "Must be 7 days in the week list."
-    assert False not in (len(day) > 0 for day in week), \
-        "All week lists must be populated."
+    assert all(week), "All week lists must be populated."
+
+    # Shows are popped off the front of each day as they are
+    # tabulated, which deques can do without shifting the rest.
+    week = [deque(day) for day in week]
 
     row_date = start_date
+    day_end = start_date + DAY
     time_remaining_on_shows = initial_time_remaining(week, start_date)
     table = WeekTable()
+    # The number of days that still have shows left to tabulate.
+    active_days = len(week)
 
     # Assuming that either all weeks are populated or none are
-    while True in (len(day) > 0 for day in week):
+    while active_days:
         # If any of the current shows' remaining durations would
         # send the schedule over 24 hours, then we take drastic
         # action by culling its remaining duration and cancelling
@@ -91,20 +102,17 @@ def tabulate_week_lists(week,
         # This is so each day is the same length.
         # (Note that Jukebox filling ensures each day is AT LEAST
         # 24 hours long)
-        for day_index in xrange(len(time_remaining_on_shows)):
+        for day_index in range(7):
             assert len(week[day_index]) > 0, \
                 "All days must be of equal length."
-            assert time_remaining_on_shows[day_index] != \
-                timedelta(seconds=0), \
+            assert time_remaining_on_shows[day_index] != NO_TIME, \
                 """A time remaining on show entry is zero.
                 This show should have been dropped off the
                 stack already.
                 """
-            if ((row_date + time_remaining_on_shows[day_index])
-                - start_date > timedelta(days=1)):
-                time_remaining_on_shows[day_index] = \
-                    (start_date + timedelta(days=1)) - row_date
-                week[day_index] = week[day_index][0:1]
+            if row_date + time_remaining_on_shows[day_index] > day_end:
+                time_remaining_on_shows[day_index] = day_end - row_date
+                week[day_index] = deque([week[day_index][0]])
 
         row_duration = calculate_row_duration(
             time_remaining_on_shows,
@@ -130,15 +138,18 @@ def tabulate_week_lists(week,
             # Push spent shows off the day stacks, deduct
             # row duration from time remaining on unspent ones
             if (time_remaining_on_shows[day_index] == row_duration):
-                del day[0]
-                time_remaining_on_shows[day_index] = (
-                    day[0].duration if len(day) > 0 else None)
+                day.popleft()
+                if day:
+                    time_remaining_on_shows[day_index] = day[0].duration
+                else:
+                    time_remaining_on_shows[day_index] = None
+                    active_days -= 1
             else:
                 time_remaining_on_shows[day_index] -= \
                     row_duration
             assert time_remaining_on_shows[day_index] is None \
-                or time_remaining_on_shows[day_index] > \
-                timedelta(seconds=0), """No time remaining on
+                or time_remaining_on_shows[day_index] > NO_TIME, \
+                """No time remaining on
                 unpopped show."""
 
         # Get ready for next row
@@ -172,10 +183,16 @@ class WeekTable(object):
             respectively.
 
             """
+            # There is one of these per table cell, so don't give
+            # each an attribute dictionary.
+            __slots__ = ('row_span', 'timeslot')
+
             def __init__(self, timeslot):
                 self.row_span = 1
                 self.timeslot = timeslot
 
+        __slots__ = ('start_time', 'entries', 'see_above', 'duration')
+
         def __init__(self, start_time, duration):
             self.start_time = start_time
             self.entries = []
@@ -200,8 +217,8 @@ class WeekTable(object):
             different is because of row compression.
 
             """
-            return column - \
-                len([x for x in self.see_above if x < column])
+            # see_above is filled in column order, so it is sorted.
+            return column - bisect.bisect_left(self.see_above, column)
 
         def get(self, column):
             """Gets the entry at the given column.
@@ -227,6 +244,10 @@ class WeekTable(object):
 
     def __init__(self):
         self.rows = []
+        # The most recent uncompressed entry in each column; this is
+        # the only entry that a new row's entry in that column can be
+        # merged into.
+        self.last_entries = {}
 
     def add(self, row):
         """Adds a new row, compressing it in the process.
@@ -239,28 +260,25 @@ class WeekTable(object):
         """
         if not isinstance(row, WeekTable.Row):
             raise TypeError("Cannot add things other than Rows.")
-        # Compress row by merging where possible with above
-        # row
-        if len(self.rows) > 0:
-            for col, show in enumerate(row.entries[:]):
-                slot = show.timeslot
-                # If the show was in the previous two rows, the
-                # row above will already have been compressed, and
-                # this manifests itself in the above show being
-                # None.
-                # We need to keep going through the rows until we
-                # hit an actual show, then see if it's the same
-                # as the one we're adding, to decide whether to
-                # compress the entry in this row too.
-                for above_row in reversed(self.rows):
-                    above_show = above_row.get(col)
-                    if above_show is None:
-                        continue
-                    elif slot is above_row.get(col).timeslot:
-                        # Compress by adding span to previous row
-                        row.entries.remove(show)
-                        row.see_above.append(col)
-                        above_row.inc_row_span(col)
+        # Compress row by merging where possible with the nearest
+        # uncompressed entry above it, which we keep track of per
+        # column instead of searching back up the rows for it.
+        last_entries = self.last_entries
+        entries = row.entries
+        # The index in entries of the current column's entry, which
+        # lags behind the column as entries are compressed away.
+        index = 0
+        for col, show in enumerate(entries[:]):
+            above_show = last_entries.get(col)
+            if (above_show is not None
+                    and show.timeslot is above_show.timeslot):
+                # Compress by adding span to the entry above
+                del entries[index]
+                row.see_above.append(col)
+                above_show.row_span += 1
+            else:
+                last_entries[col] = show
+                index += 1
         self.rows.append(row)
 
     @classmethod
@@ -302,7 +320,7 @@ class WeekTable(object):
             elif range_data.exclude_subsuming:
                 raise ValueError(
                     "Schedule column data must include-subsuming.")
-            range_list_pure.append(range_data.data[:])
+            range_list_pure.append(range_data.data)
         return tabulate_week_lists(
             range_list_pure,
             range_list[0].start)